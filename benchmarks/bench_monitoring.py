@@ -0,0 +1,50 @@
+""" Overhead of the drift monitoring on the scoring path.
+
+    Times `FeatureStats.update` (what `score_batch` adds per call) for a
+    single-row online request and a 10k-row batch with 30 float features
+    and ~1% nulls, and fails when either exceeds its budget in microseconds.
+
+    python -m benchmarks.bench_monitoring [--online-budget-us 100]
+                                          [--batch-budget-us 2000]
+"""
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from dsc_wait_prediction.models.monitoring import FeatureStats
+
+
+def time_update(stats, X, number):
+    runs = timeit.repeat(lambda: stats.update(X), number=number, repeat=5)
+    return min(runs) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--online-budget-us", type=float, default=100.0)
+    parser.add_argument("--batch-budget-us", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    columns = [f"f{i}" for i in range(30)]
+    batch = pd.DataFrame(rng.normal(size=(10_000, 30)), columns=columns)
+    batch = batch.mask(batch > 2.5)
+    online = batch.iloc[:1]
+
+    stats = FeatureStats(columns)
+    online_us = time_update(stats, online, number=2000)
+    batch_us = time_update(stats, batch, number=100)
+
+    print(f"1-row update:   {online_us:8.1f} us/call "
+          f"(budget {args.online_budget_us:.0f} us)")
+    print(f"10k-row update: {batch_us:8.1f} us/call, "
+          f"{batch_us / len(batch) * 1e3:.1f} ns/row "
+          f"(budget {args.batch_budget_us:.0f} us)")
+    assert online_us <= args.online_budget_us, "1-row update over budget"
+    assert batch_us <= args.batch_budget_us, "10k-row update over budget"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from dsc_wait_prediction.cli import main
+
+main(prog_name="dsc_wait_prediction")
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import click
+import logging
+from dotenv import find_dotenv, load_dotenv
+from dsc_wait_prediction.data import make_dataset
+from dsc_wait_prediction.features import build_features
+from dsc_wait_prediction.models import train_model, tune_threshold
+
+
+@click.group()
+def main():
+    """ Data Science Challenge @ EEF wait prediction pipeline.
+
+        Subcommands only import their heavy dependencies (polars, sklearn,
+        catboost, ...) when they run, keep it that way (see `make
+        import_bench`).
+    """
+    log_fmt = '%(asctime)s - %(module)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    # find .env automagically by walking up directories until it's found, then
+    # load up the .env entries as environment variables
+    load_dotenv(find_dotenv())
+
+
+main.add_command(make_dataset.main, name="make-dataset")
+main.add_command(build_features.main, name="build-features")
+main.add_command(train_model.main, name="train")
+main.add_command(tune_threshold.main, name="tune-threshold")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,6 @@
 import click
 import logging
 from pathlib import Path
-from dotenv import find_dotenv, load_dotenv
-import requests
-import polars as pl
 
 
 def parse_airport_info(file_lines):
@@ -69,6 +66,8 @@ def parse_airport_info(file_lines):
 
 
 def download_csv(url, file_path):
+    import requests
+
     response = requests.get(url)
     with open(file_path, 'wb') as f:
         f.write(response.content)
@@ -93,6 +92,7 @@ def main(input_filepath, output_filepath):
     if train_path.is_file() or test_path.is_file():
         logger.info('splits already exists (skipping process)')
     else:
+        import polars as pl
         df = pl.read_csv(data_file, null_values="NA")
         train_ds = df.filter(pl.col("espera").is_not_null())
         test_ds = df.filter(pl.col("espera").is_null())
@@ -105,7 +105,8 @@ def main(input_filepath, output_filepath):
     airports_ds = Path(output_filepath).joinpath("airports.csv")
     if airports_ds.is_file():
         logger.info('transformed aiport data already exists (skipping process)')
-    else:    
+    else:
+        import polars as pl
         ap_info = open(ap_data_file, "rt").readlines()
         ap_info = parse_airport_info(ap_info)
         columns = ["ICAO", "lat", "lon", "n_pistas", "desig_pista1", "desig_pista2"]
@@ -142,16 +143,3 @@ def main(input_filepath, output_filepath):
     else:
         download_csv(test_url, test_img_file)
 
-
-if __name__ == '__main__':
-    log_fmt = '%(asctime)s - %(module)s - %(levelname)s - %(message)s'
-    logging.basicConfig(level=logging.INFO, format=log_fmt)
-
-    # not used in this stub but often useful for finding various files
-    project_dir = Path(__file__).resolve().parents[2]
-
-    # find .env automagically by walking up directories until it's found, then
-    # load up the .env entries as environment variables
-    load_dotenv(find_dotenv())
-
-    main()
@@ -1,17 +1,15 @@
 # -*- coding: utf-8 -*-
 import click
 import logging
+import math
 from pathlib import Path
-from dotenv import find_dotenv, load_dotenv
-import polars as pl
-import numpy as np
 
 
 def sin_col(col, period):
-    return np.sin(col / period * 2 * np.pi)
+    return (col / period * 2 * math.pi).sin()
 
 def cos_col(col, period):
-    return np.cos(col / period * 2 * np.pi)
+    return (col / period * 2 * math.pi).cos()
 
 
 @click.command()
@@ -30,6 +28,9 @@ def main(input_filepath, output_filepath):
         logger.info('feature files already exist (skipping process)')
         return
 
+    import polars as pl
+    import numpy as np
+
     logger.info('loading splits')
     train_val_file = Path(input_filepath).joinpath("train_val.csv")
     assert train_val_file.is_file(), f'Dataset path "{train_val_file.absolute()}" is invalid.'
@@ -154,16 +155,3 @@ def main(input_filepath, output_filepath):
         index=False, na_rep="NA"
     )
 
-
-if __name__ == '__main__':
-    log_fmt = '%(asctime)s - %(module)s - %(levelname)s - %(message)s'
-    logging.basicConfig(level=logging.INFO, format=log_fmt)
-
-    # not used in this stub but often useful for finding various files
-    project_dir = Path(__file__).resolve().parents[2]
-
-    # find .env automagically by walking up directories until it's found, then
-    # load up the .env entries as environment variables
-    load_dotenv(find_dotenv())
-
-    main()
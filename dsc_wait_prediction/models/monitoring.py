@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+import json
+import math
+import time
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _json_float(value):
+    # undefined statistics are exported as null instead of invalid JSON NaN
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class FeatureStats:
+    """ Streaming per-feature count/mean/variance/null rate.
+
+        Batches are merged with Chan's parallel update of Welford's
+        algorithm, so memory stays constant regardless of rows seen.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        n = len(self.columns)
+        self.rows = 0
+        self.count = np.zeros(n)
+        self.mean = np.zeros(n)
+        self.m2 = np.zeros(n)
+        self.nulls = np.zeros(n)
+
+    def _as_array(self, X):
+        # frames that already hold exactly `self.columns` (the usual case)
+        # skip the pandas column selection, which dominates the cost of
+        # small online batches
+        if isinstance(X, np.ndarray):
+            values = X
+        elif X.columns.tolist() == self.columns:
+            values = X.to_numpy(dtype=float)
+        else:
+            values = X[self.columns].to_numpy(dtype=float)
+        values = np.asarray(values, dtype=float)
+        return values.reshape(1, -1) if values.ndim == 1 else values
+
+    def update(self, X):
+        """ Merges a batch given as a DataFrame (any column order/superset)
+            or as an array whose columns are in `self.columns` order.
+        """
+        values = self._as_array(X)
+        n_rows = values.shape[0]
+        if n_rows == 0:
+            return
+
+        # moments are taken around a shift (the running mean, or the first
+        # row for the first batch) so a single sum/dot product pass stays
+        # numerically safe; the shifted copy is also where nulls get zeroed
+        if self.rows:
+            shift = self.mean
+        else:
+            shift = np.nan_to_num(values[0])
+        d = values - shift
+        mask = np.isnan(d)
+        b_nulls = np.count_nonzero(mask, axis=0)
+        if b_nulls.any():
+            np.copyto(d, 0.0, where=mask)
+        b_count = n_rows - b_nulls
+        s1 = d.sum(axis=0)
+        s2 = np.einsum("ij,ij->j", d, d)
+        b_mean_d = s1 / np.maximum(b_count, 1)
+        b_mean = shift + b_mean_d
+        b_m2 = np.maximum(s2 - s1 * b_mean_d, 0.0)
+
+        total = self.count + b_count
+        delta = b_mean - self.mean
+        weight = b_count / np.maximum(total, 1)
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + b_m2 + delta * delta * self.count * weight
+        self.count = total
+        self.nulls = self.nulls + b_nulls
+        self.rows += n_rows
+
+    @property
+    def var(self):
+        return np.where(
+            self.count > 1, self.m2 / np.maximum(self.count - 1, 1), 0.0
+        )
+
+    @property
+    def null_rate(self):
+        return self.nulls / max(self.rows, 1)
+
+    def summary(self):
+        """ Mean, variance and null rate with NaN where they are undefined
+            (no observed values for a feature, or no rows at all).
+        """
+        observed = self.count > 0
+        mean = np.where(observed, self.mean, np.nan)
+        var = np.where(observed, self.var, np.nan)
+        if self.rows:
+            null_rate = self.null_rate
+        else:
+            null_rate = np.full(len(self.columns), np.nan)
+        return mean, var, null_rate
+
+    def to_dict(self):
+        var = self.var
+        null_rate = self.null_rate
+        return {
+            "rows": int(self.rows),
+            "features": {
+                c: {
+                    "count": float(self.count[i]),
+                    "mean": float(self.mean[i]),
+                    "var": float(var[i]),
+                    "null_rate": float(null_rate[i]),
+                }
+                for i, c in enumerate(self.columns)
+            },
+        }
+
+    def save(self, file_path):
+        with open(file_path, "wt") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, "rt") as f:
+            data = json.load(f)
+        features = data["features"].values()
+        stats = cls(data["features"].keys())
+        stats.rows = data["rows"]
+        stats.count = np.array([v["count"] for v in features])
+        stats.mean = np.array([v["mean"] for v in features])
+        var = np.array([v["var"] for v in features])
+        stats.m2 = var * np.maximum(stats.count - 1, 0)
+        null_rate = np.array([v["null_rate"] for v in features])
+        stats.nulls = null_rate * stats.rows
+        return stats
+
+
+class LatencyHistogram:
+    """ Fixed-bucket (cumulative on export) histogram of batch latencies.
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = np.asarray(buckets, dtype=float)
+        self.counts = np.zeros(len(self.buckets) + 1, dtype=np.int64)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[np.searchsorted(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self):
+        return np.cumsum(self.counts)
+
+
+class PredictionMonitor:
+    """ Collects throughput, batch latency and input drift for the
+        prediction path and exports them as JSON or Prometheus text.
+
+        Usage:
+            monitor = PredictionMonitor.from_reference(
+                "models/feature_stats.json"
+            )
+            with monitor.time_batch(len(X)):
+                monitor.observe_features(X)
+                y = model.predict(X)
+            monitor.write_prometheus("models/metrics.prom")
+    """
+
+    def __init__(self, reference, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.reference = reference
+        self.current = FeatureStats(reference.columns)
+        self.latency = LatencyHistogram(buckets)
+        self.rows = 0
+        self.busy_seconds = 0.0
+
+    @classmethod
+    def from_reference(cls, file_path, **kwargs):
+        return cls(FeatureStats.load(file_path), **kwargs)
+
+    def observe_features(self, X):
+        self.current.update(X)
+
+    @contextmanager
+    def time_batch(self, n_rows):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.latency.observe(elapsed)
+            self.rows += n_rows
+            self.busy_seconds += elapsed
+
+    @property
+    def rows_per_second(self):
+        if self.busy_seconds > 0:
+            return self.rows / self.busy_seconds
+        return 0.0
+
+    def drift(self):
+        """ Standardized mean shift and null rate delta against the
+            reference, NaN where the current window has no observations.
+        """
+        mean, _, null_rate = self.current.summary()
+        ref_std = np.sqrt(self.reference.var)
+        safe_std = np.where(ref_std > 0, ref_std, 1.0)
+        shift = np.where(
+            ref_std > 0, (mean - self.reference.mean) / safe_std, 0.0
+        )
+        shift = np.where(np.isnan(mean), np.nan, shift)
+        null_delta = null_rate - self.reference.null_rate
+        return shift, null_delta
+
+    def to_dict(self):
+        mean, var, null_rate = self.current.summary()
+        ref_mean, ref_var, ref_null_rate = self.reference.summary()
+        shift, null_delta = self.drift()
+        features = {}
+        for i, c in enumerate(self.current.columns):
+            features[c] = {
+                "mean": _json_float(mean[i]),
+                "var": _json_float(var[i]),
+                "null_rate": _json_float(null_rate[i]),
+                "ref_mean": _json_float(ref_mean[i]),
+                "ref_var": _json_float(ref_var[i]),
+                "ref_null_rate": _json_float(ref_null_rate[i]),
+                "mean_shift": _json_float(shift[i]),
+                "null_rate_delta": _json_float(null_delta[i]),
+            }
+        return {
+            "rows": int(self.rows),
+            "busy_seconds": self.busy_seconds,
+            "rows_per_second": self.rows_per_second,
+            "latency": {
+                "buckets": self.latency.buckets.tolist(),
+                "counts": self.latency.counts.tolist(),
+                "sum": self.latency.sum,
+                "count": self.latency.count,
+            },
+            "features": features,
+        }
+
+    def to_prometheus(self, prefix="dsc_wait_prediction"):
+        latency = f"{prefix}_batch_latency_seconds"
+        lines = [
+            f"# TYPE {prefix}_rows_total counter",
+            f"{prefix}_rows_total {self.rows}",
+            f"# TYPE {prefix}_rows_per_second gauge",
+            f"{prefix}_rows_per_second {self.rows_per_second}",
+            f"# TYPE {latency} histogram",
+        ]
+        for le, c in zip(self.latency.buckets, self.latency.cumulative()):
+            lines.append(f'{latency}_bucket{{le="{le}"}} {c}')
+        lines.append(f'{latency}_bucket{{le="+Inf"}} {self.latency.count}')
+        lines.append(f"{latency}_sum {self.latency.sum}")
+        lines.append(f"{latency}_count {self.latency.count}")
+
+        mean, var, null_rate = self.current.summary()
+        shift, null_delta = self.drift()
+        gauges = [
+            ("feature_mean", mean),
+            ("feature_var", var),
+            ("feature_null_rate", null_rate),
+            ("feature_mean_shift", shift),
+            ("feature_null_rate_delta", null_delta),
+        ]
+        for name, values in gauges:
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for c, v in zip(self.current.columns, values):
+                # undefined values are left out rather than reported as drift
+                if not np.isnan(v):
+                    lines.append(
+                        f'{prefix}_{name}{{feature="{c}"}} {float(v)}'
+                    )
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, file_path):
+        with open(file_path, "wt") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_prometheus(self, file_path):
+        # write-then-rename so a textfile collector never reads a partial file
+        file_path = Path(file_path)
+        tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+        tmp_path.write_text(self.to_prometheus())
+        tmp_path.replace(file_path)
@@ -8,4 +8,22 @@ TODO:
 - Impute null values
 - Load model checkpoint
 - Predict
-"""
\ No newline at end of file
+"""
+
+
+def score_batch(model, operating_point, X, monitor=None, features=None):
+    """ Scores one batch (or a single online request) with the tuned operating
+        point, recording drift and throughput on `monitor` when given.
+
+        `features` are the inputs the drift statistics are computed on and
+        default to `X`; pass the raw, pre-imputation features so null rates
+        are comparable with the training reference. Updating the drift
+        statistics is timed together with the model, so its overhead shows
+        up in the latency histogram.
+    """
+    if monitor is None:
+        return operating_point.predict(model.predict_proba(X)[:, 1])
+    with monitor.time_batch(len(X)):
+        monitor.observe_features(X if features is None else features)
+        y_pred = operating_point.predict(model.predict_proba(X)[:, 1])
+    return y_pred
@@ -2,26 +2,32 @@
 import click
 import logging
 from pathlib import Path
-from dotenv import find_dotenv, load_dotenv
-import polars as pl
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.experimental import enable_iterative_imputer 
-from sklearn.impute import IterativeImputer
-from sklearn.metrics import classification_report, ConfusionMatrixDisplay
-from catboost import CatBoostClassifier
-import matplotlib.pyplot as plt
-import seaborn as sns
-import datetime
 import pickle
-sns.set_theme(style="white")
+from dsc_wait_prediction.models.tune_threshold import operating_point_options
 
 @click.command()
 @click.argument('input_filepath', type=click.Path(exists=True))
 @click.argument('output_filepath', type=click.Path())
-def main(input_filepath, output_filepath):
+@operating_point_options
+def main(input_filepath, output_filepath, calibration, beta):
     """ Runs model training
     """
+    # heavy dependencies are imported here so `--help` and the other
+    # subcommands of the CLI don't pay for them
+    import polars as pl
+    import numpy as np
+    from sklearn.model_selection import train_test_split
+    from sklearn.experimental import enable_iterative_imputer
+    from sklearn.impute import IterativeImputer
+    from sklearn.metrics import classification_report, ConfusionMatrixDisplay
+    from catboost import CatBoostClassifier
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from dsc_wait_prediction.models.monitoring import FeatureStats, PredictionMonitor
+    from dsc_wait_prediction.models.tune_threshold import OperatingPoint
+    from dsc_wait_prediction.models.predict_model import score_batch
+    sns.set_theme(style="white")
+
     logger = logging.getLogger(__name__)
     logger.info('starting training procedure')
     
@@ -41,6 +47,12 @@ def main(input_filepath, output_filepath):
 
     logger.info('filling null values with sklearn.impute.IterativeImputer')
     cols = list(X_train.columns)[3:]
+    logger.info('recording training feature distribution for drift monitoring')
+    reference = FeatureStats(cols)
+    reference.update(X_train)
+    monitor = PredictionMonitor(reference)
+    test_raw = test[cols].copy()
+
     imp_train = IterativeImputer(max_iter=15, random_state=42)
     imp_val = IterativeImputer(max_iter=15, random_state=42)
     imp_test = IterativeImputer(max_iter=15, random_state=42, keep_empty_features=True)
@@ -67,12 +79,33 @@ def main(input_filepath, output_filepath):
     logger.info('executing training')
     model.fit(X_train, y_train)
 
-    logger.info('evaluating on validation data')
-    y_pred_val = model.predict(X_val)
+    output_filepath = Path(output_filepath)
+    output_filepath.mkdir(parents=True, exist_ok=True)
+
+    logger.info('splitting validation data into tuning and held-out halves')
+    X_tune, X_holdout, y_tune, y_holdout = train_test_split(
+        X_val, y_val, test_size=0.5, random_state=7, stratify=y_val
+    )
+
+    logger.info('caching validation probabilities')
+    proba_tune = model.predict_proba(X_tune)[:, 1]
+    proba_holdout = model.predict_proba(X_holdout)[:, 1]
+    np.savez(
+        output_filepath / "val_proba.npz",
+        y_tune=y_tune.to_numpy(), proba_tune=proba_tune,
+        y_holdout=y_holdout.to_numpy(), proba_holdout=proba_holdout,
+    )
+
+    logger.info(f'tuning operating point on the tuning half (calibration={calibration}, beta={beta})')
+    operating_point = OperatingPoint.fit(y_tune.to_numpy(), proba_tune, calibration, beta)
+    logger.info(f'chosen threshold {operating_point.threshold:.4f} with tuning scores {operating_point.scores}')
+
+    logger.info('evaluating on held-out validation data')
+    y_pred_holdout = operating_point.predict(proba_holdout)
 
     logger.info('evaluation results:')
-    print(classification_report(y_val, y_pred_val))
-    ConfusionMatrixDisplay.from_predictions(y_val, y_pred_val, normalize="true", values_format=".3f")
+    print(classification_report(y_holdout, y_pred_holdout))
+    ConfusionMatrixDisplay.from_predictions(y_holdout, y_pred_holdout, normalize="true", values_format=".3f")
     plt.show()
     importances = model.feature_importances_
     cols = np.array(list(X.columns))
@@ -81,28 +114,19 @@ def main(input_filepath, output_filepath):
     sns.barplot(x=importances[idx], y=cols[idx])
     plt.show()
 
-    y_pred = model.predict(test.drop("espera", axis=1))
+    X_test = test.drop("espera", axis=1)
+    y_pred = score_batch(model, operating_point, X_test, monitor, features=test_raw)
     submission_file_base = Path(input_filepath).parent / "interm" / "test.csv"
     assert submission_file_base.is_file(), "Cannot find submission file base (original test data with flight ids). " \
          + f"Should be in {submission_file_base}!"
     submission = pl.read_csv(submission_file_base, null_values="NA")[["flightid"]]
     submission = submission.with_columns(pl.Series(name="espera", values=y_pred))
 
-    output_filepath = Path(output_filepath)
-    output_filepath.mkdir(parents=True, exist_ok=True)
     submission.write_csv(output_filepath / "submission.csv")
-    pickle.dump(model, open(output_filepath / "catboost.pkl", "wb"))
-
-
-if __name__ == '__main__':
-    log_fmt = '%(asctime)s - %(module)s - %(levelname)s - %(message)s'
-    logging.basicConfig(level=logging.INFO, format=log_fmt)
-
-    # not used in this stub but often useful for finding various files
-    project_dir = Path(__file__).resolve().parents[2]
-
-    # find .env automagically by walking up directories until it's found, then
-    # load up the .env entries as environment variables
-    load_dotenv(find_dotenv())
+    with open(output_filepath / "catboost.pkl", "wb") as f:
+        pickle.dump(model, f)
+    operating_point.save(output_filepath / "operating_point.pkl")
+    reference.save(output_filepath / "feature_stats.json")
+    monitor.write_json(output_filepath / "metrics.json")
+    monitor.write_prometheus(output_filepath / "metrics.prom")
 
-    main()
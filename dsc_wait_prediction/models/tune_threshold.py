@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import click
+import logging
+from pathlib import Path
+import pickle
+
+
+CALIBRATION_METHODS = ["isotonic", "platt", "none"]
+
+
+def sweep_thresholds(y_true, proba, beta=1.0):
+    """ Precision, recall and F-beta for every distinct threshold at once.
+
+        Scores are sorted once and true/false positive counts accumulated,
+        so the whole sweep is O(n log n) instead of one pass per threshold.
+        A sample is predicted positive when `proba >= threshold`.
+    """
+    import numpy as np
+
+    y_true = np.asarray(y_true, dtype=float)
+    proba = np.asarray(proba, dtype=float)
+    order = np.argsort(-proba, kind="mergesort")
+    p = proba[order]
+    y = y_true[order]
+
+    tp = np.cumsum(y)
+    fp = np.cumsum(1 - y)
+    distinct = np.r_[p[1:] != p[:-1], True]
+    thresholds, tp, fp = p[distinct], tp[distinct], fp[distinct]
+
+    precision = tp / (tp + fp)
+    recall = tp / max(y.sum(), 1)
+    b2 = beta ** 2
+    denom = b2 * precision + recall
+    safe_denom = np.where(denom > 0, denom, 1)
+    fbeta = np.where(
+        denom > 0, (1 + b2) * precision * recall / safe_denom, 0.0
+    )
+    return thresholds, precision, recall, fbeta
+
+
+def best_threshold(y_true, proba, beta=1.0):
+    thresholds, precision, recall, fbeta = sweep_thresholds(
+        y_true, proba, beta
+    )
+    i = int(fbeta.argmax())
+    return float(thresholds[i]), {
+        "precision": float(precision[i]),
+        "recall": float(recall[i]),
+        "fbeta": float(fbeta[i]),
+    }
+
+
+def score_predictions(y_true, y_pred, beta=1.0):
+    import numpy as np
+
+    y_true = np.asarray(y_true, dtype=bool)
+    y_pred = np.asarray(y_pred, dtype=bool)
+    tp = (y_true & y_pred).sum()
+    precision = tp / max(y_pred.sum(), 1)
+    recall = tp / max(y_true.sum(), 1)
+    b2 = beta ** 2
+    denom = b2 * precision + recall
+    fbeta = (1 + b2) * precision * recall / denom if denom > 0 else 0.0
+    return {
+        "precision": float(precision),
+        "recall": float(recall),
+        "fbeta": float(fbeta),
+    }
+
+
+class ProbabilityCalibrator:
+    """ Maps raw positive class probabilities to calibrated ones, either with
+        isotonic regression or with Platt scaling (logistic regression on the
+        logit of the raw probability).
+    """
+
+    def __init__(self, method="isotonic"):
+        assert method in ["isotonic", "platt"], \
+            f'Unknown calibration method "{method}".'
+        self.method = method
+        self.model = None
+
+    @staticmethod
+    def _logit(proba):
+        import numpy as np
+
+        p = np.clip(np.asarray(proba, dtype=float), 1e-6, 1 - 1e-6)
+        return np.log(p / (1 - p)).reshape(-1, 1)
+
+    def fit(self, y_true, proba):
+        if self.method == "isotonic":
+            from sklearn.isotonic import IsotonicRegression
+            self.model = IsotonicRegression(
+                y_min=0.0, y_max=1.0, out_of_bounds="clip"
+            )
+            self.model.fit(proba, y_true)
+        else:
+            from sklearn.linear_model import LogisticRegression
+            # effectively unregularized, as in Platt scaling; the default L2
+            # penalty shrinks the slope and pulls probabilities to the base
+            # rate (a huge C instead of penalty=None works on all sklearn
+            # versions)
+            self.model = LogisticRegression(C=1e10)
+            self.model.fit(self._logit(proba), y_true)
+        return self
+
+    def transform(self, proba):
+        if self.method == "isotonic":
+            return self.model.predict(proba)
+        return self.model.predict_proba(self._logit(proba))[:, 1]
+
+
+class OperatingPoint:
+    """ Optional calibrator plus decision threshold, stored next to the model
+        so the operating point can be changed without retraining.
+    """
+
+    def __init__(self, threshold=0.5, calibrator=None, beta=1.0, scores=None):
+        self.threshold = threshold
+        self.calibrator = calibrator
+        self.beta = beta
+        self.scores = scores or {}
+
+    @classmethod
+    def fit(cls, y_true, proba, method="isotonic", beta=1.0):
+        calibrator = None
+        if method != "none":
+            calibrator = ProbabilityCalibrator(method).fit(y_true, proba)
+            proba = calibrator.transform(proba)
+        threshold, scores = best_threshold(y_true, proba, beta)
+        return cls(threshold, calibrator, beta, scores)
+
+    def predict_proba(self, proba):
+        if self.calibrator is None:
+            return proba
+        return self.calibrator.transform(proba)
+
+    def predict(self, proba):
+        return (self.predict_proba(proba) >= self.threshold).astype(int)
+
+    def save(self, file_path):
+        with open(file_path, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(file_path):
+        with open(file_path, "rb") as f:
+            return pickle.load(f)
+
+
+def _positive_beta(ctx, param, value):
+    if value <= 0:
+        raise click.BadParameter('must be greater than 0.')
+    return value
+
+
+def operating_point_options(f):
+    """ Shared `--calibration` and `--beta` options of the commands that fit
+        an `OperatingPoint`.
+    """
+    f = click.option(
+        '--beta', type=float, default=1.0, callback=_positive_beta,
+        help='Threshold is chosen to maximize F-beta on the tuning half '
+             'of the validation data.'
+    )(f)
+    f = click.option(
+        '--calibration', type=click.Choice(CALIBRATION_METHODS),
+        default="isotonic",
+        help='Probability calibrator fitted on the tuning half of the '
+             'validation data.'
+    )(f)
+    return f
+
+
+@click.command()
+@click.argument('model_filepath', type=click.Path(exists=True))
+@operating_point_options
+def main(model_filepath, calibration, beta):
+    """ Re-tunes the decision threshold and probability calibration from the
+        validation probabilities cached by training (no retraining needed).
+    """
+    import numpy as np
+
+    logger = logging.getLogger(__name__)
+    logger.info('loading cached validation probabilities')
+    val_proba_file = Path(model_filepath).joinpath("val_proba.npz")
+    assert val_proba_file.is_file(), \
+        f'Cached probabilities path "{val_proba_file.absolute()}" is invalid.'
+    cache = np.load(val_proba_file)
+
+    logger.info(
+        f'fitting operating point (calibration={calibration}, beta={beta})'
+    )
+    operating_point = OperatingPoint.fit(
+        cache["y_tune"], cache["proba_tune"], calibration, beta
+    )
+    logger.info(
+        f'chosen threshold {operating_point.threshold:.4f} '
+        f'with tuning scores {operating_point.scores}'
+    )
+
+    # the held-out half is only ever scored, never used to fit
+    y_pred_holdout = operating_point.predict(cache["proba_holdout"])
+    holdout_scores = score_predictions(
+        cache["y_holdout"], y_pred_holdout, beta
+    )
+    logger.info(f'held-out validation scores {holdout_scores}')
+    operating_point.save(Path(model_filepath) / "operating_point.pkl")
@@ -19,4 +19,9 @@ setup(
     long_description=read("README.md"),
     description='Submission to Data Science Challenge @ EEF promoted by ITA - Brazil',
     license='MIT',
+    entry_points={
+        'console_scripts': [
+            'dsc_wait_prediction=dsc_wait_prediction.cli:main',
+        ],
+    },
 )
@@ -0,0 +1,71 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = [
+    "polars", "numpy", "pandas", "sklearn", "catboost",
+    "matplotlib", "seaborn", "requests",
+]
+
+# runs in a fresh interpreter, the test session itself has numpy loaded
+SCRIPT = """
+import json, sys
+from click.testing import CliRunner
+from dsc_wait_prediction.cli import main
+result = CliRunner().invoke(main, sys.argv[1:])
+print(json.dumps({
+    "exit_code": result.exit_code,
+    "output": result.output,
+    "loaded": sorted(m for m in %r if m in sys.modules),
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_cli(*args):
+    proc = subprocess.run(
+        [sys.executable, "-c", SCRIPT, *map(str, args)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def touch(directory, *names):
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        (directory / name).write_text("")
+
+
+def test_help_loads_no_heavy_modules():
+    result = run_cli("--help")
+    assert result["exit_code"] == 0
+    assert result["loaded"] == []
+
+
+def test_cached_build_features_loads_no_heavy_modules(tmp_path):
+    touch(tmp_path / "interm")
+    touch(tmp_path / "processed",
+          "train_val_features.csv", "test_features.csv")
+    result = run_cli("build-features",
+                     tmp_path / "interm", tmp_path / "processed")
+    assert result["exit_code"] == 0, result["output"]
+    assert result["loaded"] == []
+
+
+def test_cached_make_dataset_loads_no_heavy_modules(tmp_path):
+    touch(tmp_path / "raw", "public.csv", "airports.txt")
+    touch(tmp_path / "interm",
+          "train_val.csv", "test.csv", "airports.csv",
+          "metar_data.csv", "test_metar_data.csv",
+          "image_color_data.csv", "test_image_color_data.csv")
+    result = run_cli("make-dataset", tmp_path / "raw", tmp_path / "interm")
+    assert result["exit_code"] == 0, result["output"]
+    assert result["loaded"] == []
+
+
+@pytest.mark.parametrize("command", ["train", "tune-threshold"])
+def test_subcommand_help_loads_no_heavy_modules(command):
+    result = run_cli(command, "--help")
+    assert result["exit_code"] == 0
+    assert result["loaded"] == []
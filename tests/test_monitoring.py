@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dsc_wait_prediction.models.monitoring import (
+    FeatureStats, PredictionMonitor
+)
+from dsc_wait_prediction.models.predict_model import score_batch
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(13)
+    df = pd.DataFrame({
+        "a": rng.normal(3.0, 2.0, 1000),
+        "b": rng.exponential(1.5, 1000),
+    })
+    df.loc[rng.random(1000) < 0.1, "a"] = np.nan
+    return df
+
+
+def batched_stats(df, sizes):
+    stats = FeatureStats(df.columns)
+    start = 0
+    for size in sizes:
+        stats.update(df.iloc[start:start + size])
+        start += size
+    assert start == len(df)
+    return stats
+
+
+def test_batch_merge_matches_numpy(features):
+    stats = batched_stats(features, [1, 0, 7, 300, 92, 600])
+    values = features.to_numpy()
+    np.testing.assert_allclose(stats.mean, np.nanmean(values, axis=0))
+    np.testing.assert_allclose(stats.var, np.nanvar(values, axis=0, ddof=1))
+    np.testing.assert_allclose(stats.null_rate, np.isnan(values).mean(axis=0))
+    assert stats.rows == len(features)
+
+
+def test_save_load_round_trip(features, tmp_path):
+    stats = batched_stats(features, [250, 750])
+    stats.save(tmp_path / "feature_stats.json")
+    loaded = FeatureStats.load(tmp_path / "feature_stats.json")
+    assert loaded.columns == stats.columns
+    assert loaded.rows == stats.rows
+    for attr in ["count", "mean", "m2", "nulls"]:
+        np.testing.assert_allclose(getattr(loaded, attr), getattr(stats, attr))
+
+    # merging into a loaded sketch must behave as if it was never saved
+    loaded.update(features)
+    stats.update(features)
+    np.testing.assert_allclose(loaded.var, stats.var)
+
+
+def test_prometheus_histogram_is_cumulative(features):
+    monitor = PredictionMonitor(
+        batched_stats(features, [1000]), buckets=(0.1, 1.0, 10.0)
+    )
+    for seconds in [0.05, 0.5, 0.5, 5.0, 50.0]:
+        monitor.latency.observe(seconds)
+
+    lines = monitor.to_prometheus(prefix="p").splitlines()
+    buckets = [
+        l for l in lines if l.startswith("p_batch_latency_seconds_bucket")
+    ]
+    counts = [int(l.rsplit(" ", 1)[1]) for l in buckets]
+    assert counts == [1, 3, 4, 5]
+    assert buckets[-1] == 'p_batch_latency_seconds_bucket{le="+Inf"} 5'
+    assert "p_batch_latency_seconds_count 5" in lines
+
+
+def test_score_batch_records_throughput_and_drift(features):
+    class Model:
+        def predict_proba(self, X):
+            p = np.full(len(X), 0.7)
+            return np.column_stack([1 - p, p])
+
+    class Threshold:
+        def predict(self, proba):
+            return (proba >= 0.5).astype(int)
+
+    monitor = PredictionMonitor(batched_stats(features, [1000]))
+    shifted = features + 2.0
+    y_pred = score_batch(
+        Model(), Threshold(), shifted.fillna(0), monitor, features=shifted
+    )
+
+    assert (y_pred == 1).all()
+    assert monitor.rows == len(features)
+    assert monitor.latency.count == 1
+    shift, null_delta = monitor.drift()
+    np.testing.assert_allclose(shift, 2.0 / np.sqrt(monitor.reference.var))
+    np.testing.assert_allclose(null_delta, 0.0, atol=1e-12)
+
+
+def test_large_offset_and_array_input(features):
+    # the shifted single-pass moments must not lose precision on features
+    # like pressure that sit far from zero
+    offset = features + 1e6
+    stats = batched_stats(offset, [3, 997])
+    np.testing.assert_allclose(stats.var, np.nanvar(offset, axis=0, ddof=1))
+
+    from_array = FeatureStats(features.columns)
+    from_array.update(offset.to_numpy())
+    np.testing.assert_allclose(from_array.mean, stats.mean)
+
+
+def test_drift_is_undefined_without_observations(features):
+    reference = batched_stats(features, [1000])
+    monitor = PredictionMonitor(reference)
+
+    shift, null_delta = monitor.drift()
+    assert np.isnan(shift).all() and np.isnan(null_delta).all()
+    assert "feature_mean_shift{" not in monitor.to_prometheus()
+    assert monitor.to_dict()["features"]["a"]["mean_shift"] is None
+
+    # an all-null column has a null rate but no mean to compare
+    batch = features.iloc[:10].copy()
+    batch["a"] = np.nan
+    monitor.observe_features(batch)
+    shift, null_delta = monitor.drift()
+    assert np.isnan(shift[0]) and not np.isnan(shift[1])
+    assert null_delta[0] == pytest.approx(1 - reference.null_rate[0])
+    text = monitor.to_prometheus(prefix="p")
+    assert 'p_feature_mean_shift{feature="a"}' not in text
+    assert 'p_feature_mean_shift{feature="b"}' in text
+    assert 'p_feature_null_rate_delta{feature="a"}' in text
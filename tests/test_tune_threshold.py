@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from dsc_wait_prediction.models.tune_threshold import (
+    OperatingPoint, ProbabilityCalibrator, main, score_predictions,
+    sweep_thresholds,
+)
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(7)
+    y = rng.integers(0, 2, 2000)
+    proba = np.round(np.clip(0.35 * y + 0.65 * rng.random(2000), 0, 1), 2)
+    return y, proba
+
+
+def test_sweep_matches_per_threshold_scores(scores):
+    y, proba = scores
+    thresholds, precision, recall, fbeta = sweep_thresholds(y, proba, beta=2.0)
+    for i in [0, len(thresholds) // 2, len(thresholds) - 1]:
+        expected = score_predictions(y, proba >= thresholds[i], beta=2.0)
+        assert precision[i] == pytest.approx(expected["precision"])
+        assert recall[i] == pytest.approx(expected["recall"])
+        assert fbeta[i] == pytest.approx(expected["fbeta"])
+
+
+def test_platt_scaling_is_unregularized():
+    rng = np.random.default_rng(3)
+    # raw scores are overconfident: true log-odds are half the raw log-odds
+    logit = rng.normal(0, 3, 20000)
+    y = rng.random(20000) < 1 / (1 + np.exp(-0.5 * logit))
+    proba = 1 / (1 + np.exp(-logit))
+    calibrator = ProbabilityCalibrator("platt").fit(y, proba)
+    assert calibrator.model.coef_[0, 0] == pytest.approx(0.5, abs=0.05)
+
+
+def test_operating_point_round_trip(scores, tmp_path):
+    y, proba = scores
+    point = OperatingPoint.fit(y, proba, "isotonic", beta=1.0)
+    point.save(tmp_path / "operating_point.pkl")
+    loaded = OperatingPoint.load(tmp_path / "operating_point.pkl")
+    assert loaded.threshold == point.threshold
+    np.testing.assert_array_equal(loaded.predict(proba), point.predict(proba))
+
+
+def test_tune_threshold_uses_tuning_half_only(scores, tmp_path):
+    y, proba = scores
+    np.savez(
+        tmp_path / "val_proba.npz",
+        y_tune=y[:1000], proba_tune=proba[:1000],
+        y_holdout=1 - y[1000:], proba_holdout=proba[1000:],
+    )
+    result = CliRunner().invoke(main, [str(tmp_path), "--calibration", "none"])
+    assert result.exit_code == 0, result.output
+    point = OperatingPoint.load(tmp_path / "operating_point.pkl")
+    expected = OperatingPoint.fit(y[:1000], proba[:1000], "none")
+    assert point.threshold == expected.threshold
+
+
+@pytest.mark.parametrize("beta", ["0", "-1"])
+def test_non_positive_beta_is_rejected(tmp_path, beta):
+    result = CliRunner().invoke(main, [str(tmp_path), "--beta", beta])
+    assert result.exit_code != 0
+    assert "must be greater than 0" in result.output